@@ -0,0 +1,122 @@
+let currentMode = 'side-by-side';
+let currentTest = '';
+let currentFunction = '';
+
+document.getElementById('testSelect').addEventListener('change', function(e) {
+    currentTest = e.target.value;
+    updateFunctionList();
+    updateDisplay();
+});
+
+document.getElementById('functionSelect').addEventListener('change', function(e) {
+    currentFunction = e.target.value;
+    updateDisplay();
+});
+
+function updateFunctionList() {
+    const funcSelect = document.getElementById('functionSelect');
+    funcSelect.innerHTML = '<option value="">Select a function...</option>';
+    if (currentTest && tests[currentTest]) {
+        funcSelect.disabled = false;
+        const sortedFunctions = Object.keys(tests[currentTest]).sort();
+        for (const func of sortedFunctions) {
+            const option = document.createElement('option');
+            option.value = func;
+            option.textContent = func.replace(/_/g, ' ').replace('.dot', '');
+            funcSelect.appendChild(option);
+        }
+    } else {
+        funcSelect.disabled = true;
+    }
+}
+
+function updateDisplay() {
+    const container = document.getElementById('imageContainer');
+    if (!currentTest || !currentFunction || !tests[currentTest] || !tests[currentTest][currentFunction]) {
+        container.innerHTML = '<div class="no-data">Select a test and function to view comparison</div>';
+    } else {
+        const images = tests[currentTest][currentFunction];
+        container.className = 'image-container';
+        container.innerHTML = `
+            <div class="image-wrapper">
+                <h3>Original</h3>
+                <img src="../../${images.original}" alt="Original CFG">
+            </div>
+            <div class="image-wrapper">
+                <h3>Obfuscated</h3>
+                <img src="../../${images.obfuscated}" alt="Obfuscated CFG">
+            </div>
+        `;
+    }
+    updateMetrics();
+}
+
+function setMode(mode) {
+    currentMode = mode;
+    document.querySelectorAll('.mode-btn').forEach(btn => btn.classList.remove('active'));
+    event.target.classList.add('active');
+    updateDisplay();
+}
+
+function toggleMetrics() {
+    updateMetrics();
+    const metricsDiv = document.getElementById('metrics');
+    metricsDiv.classList.toggle('show');
+}
+
+function fmtBytes(size) {
+    if (size === undefined || size === null || size < 0) return 'N/A';
+    if (size === 0) return '0 B';
+    const labels = ['B', 'KB', 'MB', 'GB', 'TB'];
+    let n = 0;
+    while (size >= 1024 && n < labels.length - 1) {
+        size /= 1024;
+        n++;
+    }
+    return n === 0 ? `${size} ${labels[n]}` : `${size.toFixed(2)} ${labels[n]}`;
+}
+
+function updateMetrics() {
+    const grid = document.getElementById('metricsGrid');
+    if (currentTest && metrics[currentTest] && Object.keys(metrics[currentTest]).length > 0) {
+        const m = metrics[currentTest];
+        const obfMetrics = m.obfuscationMetrics || {};
+        const cff = obfMetrics.controlFlowFlattening || {};
+        const se = obfMetrics.stringEncryption || {};
+        const passes = obfMetrics.passesRun || [];
+        const attrs = m.outputAttributes || {};
+        const binMetrics = m.binary_metrics || {};
+
+        grid.innerHTML = `
+            <div class="metric-card">
+                <div class="value">${cff.flattenedFunctions || 0}</div>
+                <div class="label">Flattened Functions</div>
+            </div>
+            <div class="metric-card">
+                <div class="value">${cff.flattenedBlocks || 0}</div>
+                <div class="label">Flattened Blocks</div>
+            </div>
+            <div class="metric-card">
+                <div class="value">${se.count || 0}</div>
+                <div class="label">Strings Encrypted</div>
+                <div class="sub-label">${se.method || 'N/A'}</div>
+            </div>
+             <div class="metric-card">
+                <div class="value">${binMetrics.change_pct || 'N/A'}</div>
+                <div class="label">Executable Size Change</div>
+                <div class="sub-label">${fmtBytes(binMetrics.original_size_bytes)} -> ${fmtBytes(binMetrics.obfuscated_size_bytes)}</div>
+            </div>
+            <div class="metric-card">
+                <div class="value">${attrs.stringDataSizeChange || '0.00%'}</div>
+                <div class="label">IR String Data Size Change</div>
+                <div class="sub-label">${attrs.originalIRStringDataSize || '0'} -> ${attrs.obfuscatedIRStringDataSize || '0'}</div>
+            </div>
+             <div class="metric-card pass-list-card">
+                <div class="value">${passes.join('<br>') || 'None'}</div>
+                <div class="label">Passes Run</div>
+            </div>
+        `;
+    } else {
+        grid.innerHTML = '<div class="metric-card" style="grid-column: 1 / -1;"><div class="label">No report data available for this test. <br> Please run a test (e.g., `make test-full`) to generate reports.</div></div>';
+    }
+}
@@ -1,87 +1,20 @@
 import json
+import mmap
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def create_comparison_html():
-    """Create an interactive HTML page for comparing CFGs"""
-
-    results_dir = Path("test_results")
-    viz_dir = results_dir / "visualizations"
-    comparison_dir = viz_dir / "comparison"
-    comparison_dir.mkdir(parents=True, exist_ok=True)
+# Marker the pass prints before its JSON metrics, at the end of the run
+CFF_METRICS_MARKER = b"CFF_METRICS:"
 
-    # Collect all test results
-    tests = {}
-
-    tests_dir = Path("tests")
-    known_test_names = sorted([p.stem for p in tests_dir.glob("test_*.c")])
-
-    # Find all original visualizations
-    orig_dir = viz_dir / "original"
-    obf_dir = viz_dir / "obfuscated"
-
-    if orig_dir.exists():
-        for orig_img in orig_dir.glob("*.png"):
-            # Clean the stem by removing the .dot suffix if it exists
-            img_stem = orig_img.stem.replace(".dot", "")
-
-            test_name = None
-            func_name = None
-
-            # >>> NEW: Robustly find the test name by checking for a prefix
-            for name in known_test_names:
-                # Check if the image stem starts with the test name followed by an underscore
-                if img_stem.startswith(name + "_"):
-                    test_name = name
-                    # The function name is everything after the prefix
-                    func_name = img_stem[len(name) + 1 :]
-                    break  # Found our match, stop searching
-
-            # If no prefix was found, it might be a test with no function suffix
-            if not test_name:
-                if img_stem in known_test_names:
-                    test_name = img_stem
-                    func_name = "main"  # Assume main if no function is specified
-                else:
-                    continue  # Skip this image if we can't parse it
-
-            if test_name not in tests:
-                tests[test_name] = {}
-            obf_img = obf_dir / orig_img.name
-
-            if obf_img.exists():
-                tests[test_name][func_name] = {
-                    "original": str(orig_img.relative_to(results_dir)),
-                    "obfuscated": str(obf_img.relative_to(results_dir)),
-                }
-
-    # Read metrics from logs
-    metrics = {}
-    logs_dir = results_dir / "logs"
-    if logs_dir.exists():
-        for log_file in logs_dir.glob("*.log"):
-            test_name = log_file.stem
-            metrics[test_name] = {}  # Default to empty metrics
-            with open(log_file, "r") as f:
-                for line in f:
-                    # Find the marker in the current line
-                    if "CFF_METRICS:" in line:
-                        try:
-                            # Find the start of the JSON object '{' after the marker
-                            json_start_pos = line.find("{")
-                            if json_start_pos != -1:
-                                # The rest of the line from '{' is our JSON
-                                metric_json_str = line[json_start_pos:]
-                                metrics[test_name] = json.loads(metric_json_str)
-                                # Found it, no need to check other lines in this file
-                                break
-                        except (json.JSONDecodeError, IndexError):
-                            # If parsing fails for any reason, we keep empty metrics
-                            # and move to the next file
-                            break
-
-    # Create HTML (rest of the HTML generation code remains the same)
-    html_content = """
+# The comparison page. $name marks a placeholder filled in by write_template
+HTML_TEMPLATE = r"""
         <!DOCTYPE html>
         <html lang="en">
         <head>
@@ -295,13 +228,7 @@ def create_comparison_html():
                 <div class="controls">
                     <select id="testSelect">
                         <option value="">Select a test...</option>
-    """
-
-    # Add test options
-    for test_name in sorted(tests.keys()):
-        html_content += f'<option value="{test_name}">{test_name}</option>\n'
-    html_content += (
-        """
+    $test_options
             </select>
 
             <select id="functionSelect" disabled>
@@ -335,13 +262,10 @@ def create_comparison_html():
             </div>
 
             <script>
-                const tests = """
-        + json.dumps(tests, indent=4)
-        + """;
-                
-                const metrics = """
-        + json.dumps(metrics, indent=4)
-        + """;
+                const tests = {};
+                $tests_entries
+                const metrics = {};
+                $metrics_entries
 
                 let currentMode = 'side-by-side';
                 let currentTest = '';
@@ -475,17 +399,201 @@ def create_comparison_html():
         </body>
         </html>
     """
-    )
 
-    # Write HTML file
+# HTML_TEMPLATE split once at import into literal text alternating with
+# placeholder names, so rendering is just a sequence of writes
+HTML_PIECES = re.split(
+    r"\$(test_options|tests_entries|metrics_entries)\b", HTML_TEMPLATE
+)
+
+
+def dump_json(obj, f):
+    """Writes obj to f as compact JSON, using orjson when it is available"""
+    if orjson is not None:
+        f.write(orjson.dumps(obj).decode())
+    else:
+        json.dump(obj, f, separators=(",", ":"), ensure_ascii=False)
+
+
+def write_json_entries(f, name, obj):
+    """Writes obj to f as one `name[key]=value;` statement per entry, so the
+    browser parses many small literals instead of one large one"""
+    for key, value in obj.items():
+        f.write(f"{name}[")
+        dump_json(key, f)
+        f.write("]=")
+        dump_json(value, f)
+        f.write(";\n")
+
+
+def write_template(f, pieces, writers):
+    """Streams split template pieces to f, calling writers[name](f) for each
+    placeholder"""
+    for i, piece in enumerate(pieces):
+        if i % 2:
+            writers[piece](f)
+        else:
+            f.write(piece)
+
+
+def list_dir(path):
+    """Returns the entries of path, or [] if it does not exist"""
+    try:
+        with os.scandir(path) as it:
+            return list(it)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def read_cff_metrics(log_path):
+    """Returns the CFF_METRICS JSON object from a pass log, or {} if absent"""
+    with open(log_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {}  # mmap cannot map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Search backwards from the end, where the pass writes the marker,
+            # so only the tail pages of the log are touched
+            marker_pos = mm.rfind(CFF_METRICS_MARKER)
+            if marker_pos == -1:
+                return {}
+
+            # The JSON runs from the first '{' after the marker to end of line
+            line_end = mm.find(b"\n", marker_pos)
+            if line_end == -1:
+                line_end = len(mm)
+            json_start_pos = mm.find(b"{", marker_pos, line_end)
+            if json_start_pos == -1:
+                return {}
+            metric_json = mm[json_start_pos:line_end]
+
+    try:
+        return json.loads(metric_json)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        # If parsing fails for any reason, we keep empty metrics
+        return {}
+
+
+def create_comparison_html():
+    """Create an interactive HTML page for comparing CFGs"""
+
+    results_dir = Path("test_results")
+    viz_dir = results_dir / "visualizations"
+    comparison_dir = viz_dir / "comparison"
+    comparison_dir.mkdir(parents=True, exist_ok=True)
+
+    # Collect all test results
+    tests = {}
+
+    tests_dir = Path("tests")
+    # Only membership and name lengths are needed, so no ordering is kept;
+    # the prefix search below already tries the longest match first
+    known_test_set = {
+        entry.name[:-2]
+        for entry in list_dir(tests_dir)
+        if entry.name.startswith("test_") and entry.name.endswith(".c")
+    }
+    # A "<test>_" separator can only fall between these two offsets of a stem
+    min_name_len = min(map(len, known_test_set), default=0)
+    max_name_len = max(map(len, known_test_set), default=0)
+
+    # Find all original visualizations
+    orig_dir = viz_dir / "original"
+    obf_dir = viz_dir / "obfuscated"
+
+    # List the obfuscated images once instead of checking each original
+    obf_names = {obf_entry.name for obf_entry in list_dir(obf_dir)}
+
+    # Image paths are reported relative to results_dir; every entry sits
+    # directly in one of these two directories
+    orig_rel = orig_dir.relative_to(results_dir).as_posix()
+    obf_rel = obf_dir.relative_to(results_dir).as_posix()
+
+    for entry in list_dir(orig_dir):
+        if not entry.name.endswith(".png"):
+            continue
+        # Clean the stem by removing the .dot suffix if it exists
+        img_stem = entry.name[:-4].removesuffix(".dot")
+        # Every known test name starts with "test_", skip anything else early
+        if not img_stem.startswith("test_"):
+            continue
+
+        test_name = None
+        func_name = None
+
+        # A stem that is itself a test name is that test's main function, so
+        # test_complex_nested is not read as test_complex / nested
+        if img_stem in known_test_set:
+            test_name = img_stem
+            func_name = "main"  # Assume main if no function is specified
+        else:
+            # Otherwise look up each "<test>_" prefix of the stem, longest
+            # first, so test_foo_bar_main is not claimed by test_foo
+            sep = img_stem.rfind("_", 0, max_name_len + 1)
+            while sep >= min_name_len:
+                if img_stem[:sep] in known_test_set:
+                    test_name = img_stem[:sep]
+                    # The function name is everything after the prefix
+                    func_name = img_stem[sep + 1 :]
+                    break  # Found our match, stop searching
+                sep = img_stem.rfind("_", 0, sep)
+
+        if not test_name:
+            continue  # Skip this image if we can't parse it
+
+        test_funcs = tests.setdefault(test_name, {})
+        if entry.name in obf_names:
+            test_funcs[func_name] = {
+                "original": f"{orig_rel}/{entry.name}",
+                "obfuscated": f"{obf_rel}/{entry.name}",
+            }
+
+    # Read metrics from logs
+    metrics = {}
+    logs_dir = results_dir / "logs"
+    log_entries = [
+        entry for entry in list_dir(logs_dir) if entry.name.endswith(".log")
+    ]
+    # Logs are independent, so read them on a few threads to overlap I/O
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        log_metrics = executor.map(
+            read_cff_metrics, [entry.path for entry in log_entries]
+        )
+        for entry, test_metrics in zip(log_entries, log_metrics):
+            metrics[entry.name[:-4]] = test_metrics
+
+    # Build the test options and count functions in the same pass
+    option_parts = []
+    total_funcs = 0
+    for test_name in sorted(tests):
+        option_parts.append(f'<option value="{test_name}">{test_name}</option>\n')
+        total_funcs += len(tests[test_name])
+
+    # Stream the HTML to disk piece by piece instead of building it in memory.
+    # It goes to a temporary file that is renamed into place, so an interrupted
+    # run never leaves a truncated index.html behind
     html_file = comparison_dir / "index.html"
-    with open(html_file, "w") as f:
-        f.write(html_content)
+    tmp_file = html_file.with_suffix(".html.tmp")
+    try:
+        with open(tmp_file, "w", encoding="utf-8", buffering=1 << 20) as f:
+            write_template(
+                f,
+                HTML_PIECES,
+                {
+                    "test_options": lambda f: f.writelines(option_parts),
+                    "tests_entries": lambda f: write_json_entries(f, "tests", tests),
+                    "metrics_entries": lambda f: write_json_entries(
+                        f, "metrics", metrics
+                    ),
+                },
+            )
+        os.replace(tmp_file, html_file)
+    except BaseException:
+        # Don't leave a partial temporary file behind on failure
+        tmp_file.unlink(missing_ok=True)
+        raise
 
     print(f"Created comparison viewer at {html_file}")
-    print(
-        f"Found {len(tests)} tests with {sum(len(v) for v in tests.values())} functions"
-    )
+    print(f"Found {len(tests)} tests with {total_funcs} functions")
 
 
 if __name__ == "__main__":